@@ -0,0 +1,42 @@
+"""add alerts keyset pagination indexes
+
+Revision ID: 5e3b9d7a1c24
+Revises: ababa21f9412
+Create Date: 2026-10-15 10:12:48.317205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e3b9d7a1c24'
+down_revision: Union[str, Sequence[str], None] = 'ababa21f9412'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Matches ORDER BY started_at DESC, id DESC and the (started_at, id) keyset cursor
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_alerts_started_at_id ON alerts (started_at DESC, id DESC);")
+        # Same ordering behind the auv_id / type equality filters
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_alerts_auv_started_at_id ON alerts (auv_id, started_at DESC, id DESC);")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_alerts_type_started_at_id ON alerts (type, started_at DESC, id DESC);")
+        # The composites lead with auv_id / type, so the single-column indexes only add write cost
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_alerts_auv_id;")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_alerts_type;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_alerts_auv_id ON alerts (auv_id);")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_alerts_type ON alerts (type);")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_alerts_type_started_at_id;")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_alerts_auv_started_at_id;")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_alerts_started_at_id;")
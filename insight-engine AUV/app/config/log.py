@@ -0,0 +1,52 @@
+"""
+Non-blocking logging setup.
+
+Records are pushed onto an in-memory queue and written to stderr by a
+QueueListener thread, so log I/O never blocks the event loop.
+"""
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.config.settings import LOG_LEVEL
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """Attach a QueueHandler to the `app` logger and start its listener thread.
+    Idempotent: repeated startups in one process reuse the running listener.
+    """
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(LOG_LEVEL)
+    _queue_handler = QueueHandler(log_queue)
+    app_logger.addHandler(_queue_handler)
+    app_logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush pending records, stop the listener and detach the QueueHandler."""
+    global _queue_handler, _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    app_logger = logging.getLogger("app")
+    app_logger.removeHandler(_queue_handler)
+    app_logger.propagate = True
+    _queue_handler = None
+    _listener = None
@@ -16,4 +16,9 @@ DEAD_AUV_TIMEOUT_SECONDS: int = int(os.getenv("DEAD_AUV_TIMEOUT_SECONDS"))
 DEAD_AUV_SCAN_INTERVAL_SECONDS: int = int(os.getenv("DEAD_AUV_SCAN_INTERVAL_SECONDS"))
 
 
-TELEMETRY_WS_URL = os.getenv("TELEMETRY_WS_URL")
\ No newline at end of file
+TELEMETRY_WS_URL = os.getenv("TELEMETRY_WS_URL")
+# Repeated alerts per (auv_id, alert kind, parameters/zone) within this window are collapsed into one summary broadcast
+ALERT_SUPPRESSION_WINDOW_SECONDS: float = float(os.getenv("ALERT_SUPPRESSION_WINDOW_SECONDS", "30"))
+
+# Log level for the `app` logger (DEBUG enables per-message telemetry logs)
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
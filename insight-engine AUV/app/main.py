@@ -1,19 +1,29 @@
 from contextlib import asynccontextmanager
 import asyncio
-import json
-from typing import List
+import logging
+import random
+import socket
+from typing import Dict, List, Set
 from datetime import datetime, timezone
 import aiohttp
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.websockets import WebSocketState
 
-from app.config.settings import TELEMETRY_WS_URL
+from app.config.settings import TELEMETRY_WS_URL, ALERT_SUPPRESSION_WINDOW_SECONDS
+from app.config.log import setup_logging, shutdown_logging
 from app.config.thresholds import ENVIRONMENTAL_THRESHOLDS
 from app.services.environmental_monitor import EnvironmentalMonitor
 from app.services.db import get_engine, get_sessionmaker
 from app.services.telemetry_ingest import ingest_telemetry
 from app.services.alerts_ingest import create_environmental_alert
+from app.services.alert_suppressor import (
+    AlertSuppressor,
+    environmental_alert_key,
+    environmental_alert_severity,
+    zone_alert_key,
+)
 from app.services.zone_detector import detect_zone_violation
 from app.services.dead_auv_monitor import dead_auv_scanner
 from app.services.insights import fetch_insights, InsightParams, ALERT_TYPES, SUMMARY_MODES_ALLOWED
@@ -22,16 +32,24 @@ from app.services.insights import fetch_insights, InsightParams, ALERT_TYPES, SU
 async def lifespan(app: FastAPI):
     # Startup: Initialize services
     """Start the telemetry monitoring when the application starts"""
+    setup_logging()
     # Prepare DB engine/session factory
     app.state.db_engine = get_engine()
     app.state.db_sessionmaker = get_sessionmaker()
+    # Shared HTTP client so telemetry reconnects reuse pooled keep-alive connections
+    app.state.http = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=60),
+        connector=aiohttp.TCPConnector(keepalive_timeout=75, limit=32, ttl_dns_cache=300),
+    )
     # Initialize background tasks (DB schema is managed by Alembic; no auto-create)
     # asyncio.create_task(monitor_telemetry(app))
     # Dead AUV scanner
     # asyncio.create_task(broadcast_dead_auv(app))
     yield
     # Shutdown: Cleanup resources
-    print("Shutting down Service...")
+    logger.info("Shutting down Service...")
+    await app.state.http.close()
+    shutdown_logging()
 
 app = FastAPI(
     title="DeepSeaGuard Insight Engine",
@@ -40,43 +58,137 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+logger = logging.getLogger(__name__)
+
 # Initialize environmental monitor
 env_monitor = EnvironmentalMonitor(ENVIRONMENTAL_THRESHOLDS)
 
+SEND_TIMEOUT_SECONDS = 5.0  # Per-client send timeout in the writer task
+OUTBOX_MAXSIZE = 256  # Pending messages per client before dropping the oldest
+
 class ConnectionManager:
-    """Manages WebSocket connections for broadcasting messages to clients"""
+    """Manages WebSocket connections for broadcasting messages to clients.
+    Used as a shard of ShardedConnectionManager, which serializes and publishes messages.
+
+    Each client gets a bounded outbound queue drained by its own writer task,
+    so a slow consumer never stalls the broadcaster or other clients.
+    """
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
         self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=OUTBOX_MAXSIZE)
         async with self._lock:
-            self.active_connections.append(websocket)
-            print(f"Client connected. Total connections: {len(self.active_connections)}")
+            self.active_connections[websocket] = queue
+            self._writers[websocket] = asyncio.create_task(self._writer_loop(websocket, queue))
+            logger.debug("Client connected. Total connections: %d", len(self.active_connections))
 
     async def disconnect(self, websocket: WebSocket):
         async with self._lock:
-            if websocket in self.active_connections:
-                self.active_connections.remove(websocket)
-                print(f"Client disconnected. Remaining connections: {len(self.active_connections)}")
+            queue = self.active_connections.pop(websocket, None)
+            writer = self._writers.pop(websocket, None)
+            if queue is None:
+                return
+            # Writer may be the caller when a send fails; don't cancel ourselves
+            if writer is not None and writer is not asyncio.current_task():
+                writer.cancel()
+            while not queue.empty():
+                queue.get_nowait()
+            logger.debug("Client disconnected. Remaining connections: %d", len(self.active_connections))
+
+    async def _writer_loop(self, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain a client's outbound queue; the client is disconnected whenever the writer stops"""
+        # No client_state pre-check: a closed socket raises on send and is cleaned up below
+        try:
+            while True:
+                prepared = await queue.get()
+                await asyncio.wait_for(websocket.send_text(prepared), timeout=SEND_TIMEOUT_SECONDS)
+        except (WebSocketDisconnect, RuntimeError, OSError) as e:  # OSError covers ConnectionError and TimeoutError
+            logger.warning("Error broadcasting to client: %s", e)
+        except Exception as e:
+            logger.exception("Unexpected error in client writer: %s", e)
+        # Cancellation (from disconnect) propagates past this point; any other exit must unregister the client
+        await self.disconnect(websocket)
+        # Close the socket too, so the endpoint loop ends and the client reconnects instead of
+        # staying connected without alerts (a timed-out send may also have left a partial frame)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await asyncio.wait_for(websocket.close(code=1011), timeout=SEND_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.debug("Error closing client after writer failure: %s", e)
+
+    def publish(self, prepared: str):
+        """Enqueue an already serialized message for every client"""
+        # Non-blocking enqueue per client; no awaits so the connection map can't change mid-loop
+        for queue in self.active_connections.values():
+            try:
+                queue.put_nowait(prepared)
+            except asyncio.QueueFull:
+                # Slow client: evict the oldest pending message to make room
+                queue.get_nowait()
+                queue.put_nowait(prepared)
+
+class ShardedConnectionManager:
+    """Spreads clients over K ConnectionManager shards, each with its own lock,
+    so connect/disconnect churn only contends with 1/K of the clients.
+    Messages are serialized once and then enqueued into every shard.
+    """
+    def __init__(self, shards: int = 8):
+        self.shards = [ConnectionManager() for _ in range(shards)]
+
+    def _shard(self, websocket: WebSocket) -> ConnectionManager:
+        return self.shards[hash(websocket) % len(self.shards)]
+
+    async def connect(self, websocket: WebSocket):
+        await self._shard(websocket).connect(websocket)
+
+    async def disconnect(self, websocket: WebSocket):
+        await self._shard(websocket).disconnect(websocket)
 
     async def broadcast(self, message: dict):
-        async with self._lock:
-            disconnected = []
-            for connection in self.active_connections:
-                try:
-                    if connection.client_state == WebSocketState.CONNECTED:
-                        await connection.send_json(message)
-                except Exception as e:
-                    print(f"Error broadcasting to client: {e}")
-                    disconnected.append(connection)
-            
-            # Clean up disconnected clients
-            for conn in disconnected:
-                await self.disconnect(conn)
+        if not any(shard.active_connections for shard in self.shards):
+            return
+        # Serialize once for all clients instead of per send_json call
+        prepared = orjson.dumps(message).decode()
+        for shard in self.shards:
+            shard.publish(prepared)
+
+manager = ShardedConnectionManager()
+
+ALERT_BATCH_WINDOW_SECONDS = 0.02  # Alerts raised within this window share one WebSocket frame
+
+_pending_alerts: List[dict] = []
+_alert_flush_handle: asyncio.TimerHandle | None = None
+_alert_flush_tasks: Set[asyncio.Task] = set()
+
+async def queue_alert(message: dict):
+    """Queue an alert for the next merged broadcast frame instead of sending it immediately"""
+    global _alert_flush_handle
+    _pending_alerts.append(message)
+    if _alert_flush_handle is None:
+        _alert_flush_handle = asyncio.get_running_loop().call_later(ALERT_BATCH_WINDOW_SECONDS, _flush_alerts)
+
+def _flush_alerts():
+    global _alert_flush_handle
+    _alert_flush_handle = None
+    if not _pending_alerts:
+        return
+    batch = _pending_alerts.copy()
+    _pending_alerts.clear()
+    task = asyncio.create_task(manager.broadcast({
+        "type": "alerts",
+        "batch": batch,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }))
+    # Keep a reference until done so the task isn't garbage collected mid-flight
+    _alert_flush_tasks.add(task)
+    task.add_done_callback(_alert_flush_tasks.discard)
 
-manager = ConnectionManager()
+# Collapses repeated telemetry alerts per (auv_id, alert type) before they reach clients
+alert_suppressor = AlertSuppressor(queue_alert, window_seconds=ALERT_SUPPRESSION_WINDOW_SECONDS)
 
 @app.get("/")
 async def root():
@@ -146,45 +258,77 @@ async def insights(
         cursor=cursor,
     )
     data = await fetch_insights(app.state.db_sessionmaker, params)
-    return JSONResponse(content=data, status_code=200)
+    return ORJSONResponse(content=data, status_code=200)
+
+MAX_CLIENT_MESSAGE_CHARS = 64 * 1024  # Inbound client frames larger than this are rejected unparsed
 
 @app.websocket("/ws/alert")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for clients to receive Alerts
+
+    Telemetry alerts (environmental_alert / zone_alert) arrive merged as
+    {"type": "alerts", "batch": [...], "timestamp": ...}; iterate `batch` for the individual alerts.
     """
     await manager.connect(websocket)
     try:
         while True:
+            raw = await websocket.receive_text()
+            # Reject oversized frames before parsing so one message can't stall the event loop
+            if len(raw) > MAX_CLIENT_MESSAGE_CHARS:
+                await websocket.send_text(orjson.dumps({
+                    "type": "error",
+                    "message": f"Message too large (max {MAX_CLIENT_MESSAGE_CHARS} characters)"
+                }).decode())
+                continue
             try:
-                data = await websocket.receive_json()
-                # Echo back received data with timestamp
-                await websocket.send_json({
-                    "type": "echo",
-                    "data": data,
-                    "timestamp": datetime.now(timezone.utc).isoformat()
-                })
-            except json.JSONDecodeError:
-                await websocket.send_json({
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                await websocket.send_text(orjson.dumps({
                     "type": "error",
                     "message": "Invalid JSON format"
-                })
+                }).decode())
+                continue
+            # Echo back received data with timestamp
+            await websocket.send_text(orjson.dumps({
+                "type": "echo",
+                "data": data,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }).decode())
     except WebSocketDisconnect:
         await manager.disconnect(websocket)
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.exception("WebSocket error: %s", e)
         if websocket.client_state == WebSocketState.CONNECTED:
             await websocket.close(code=1011)  # Internal error
         await manager.disconnect(websocket)
 
+TELEMETRY_BATCH_SIZE = 64  # Max telemetry frames checked per batch
+TELEMETRY_BATCH_WINDOW_SECONDS = 0.01  # Max wait to fill a batch after its first frame
+TELEMETRY_QUEUE_MAXSIZE = 1024  # Backpressure on the socket reader if processing falls behind
+
+def _enable_tcp_keepalive(ws: aiohttp.ClientWebSocketResponse, idle: int = 60, interval: int = 15, count: int = 4):
+    """Turn on OS-level TCP keepalive so half-open telemetry sockets are detected without waiting on a dead read"""
+    sock = ws.get_extra_info("socket")
+    if sock is None:
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # Probe tuning options are platform specific (Linux names shown)
+    for opt, value in (("TCP_KEEPIDLE", idle), ("TCP_KEEPINTVL", interval), ("TCP_KEEPCNT", count)):
+        if hasattr(socket, opt):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), value)
+
 async def monitor_telemetry(app: FastAPI):
     """
     Background task to monitor External telemetry Data and generate alerts
     """
-    reconnect_delay = 5  # Reconnect delay
-    
-    async def process_telemetry(telemetry: dict):
-        """Ingest telemetry data and Process to check for alerts"""
+    reconnect_base_delay = 1  # Backoff base (seconds); doubles per consecutive failed attempt
+    reconnect_max_delay = 60  # Backoff cap (seconds)
+    attempt = 0
+    telemetry_queue: asyncio.Queue = asyncio.Queue(maxsize=TELEMETRY_QUEUE_MAXSIZE)
+
+    async def process_telemetry(telemetry: dict, alert: dict | None, event_ts: str):
+        """Ingest telemetry data and handle its (pre-computed) environmental alert"""
         # 1) Persist to DB using ORM session
         tid = None # telemetry ID
         try:
@@ -193,10 +337,10 @@ async def monitor_telemetry(app: FastAPI):
                 async with session.begin():
                     tid = await ingest_telemetry(session, telemetry)
         except Exception as e:
-            print(f"DB insert error: {e}")
+            logger.error("DB insert error: %s", e)
 
         # 2) Environmental Thresholds alerts
-        if alert := env_monitor.check_thresholds(telemetry):
+        if alert:
             # persist alert into DB
             try:
                 Session = app.state.db_sessionmaker
@@ -209,64 +353,145 @@ async def monitor_telemetry(app: FastAPI):
                             telemetry_id=tid,
                         )
             except Exception as e:
-                print(f"Env alert DB error: {e}")
+                logger.error("Env alert DB error: %s", e)
 
             # broadcast alert to clients
-            await manager.broadcast({
+            await alert_suppressor.submit(environmental_alert_key(telemetry.get("auv_id"), alert), {
                 "type": "environmental_alert",
                 "data": alert,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            })
-            print(f"Env alert: {alert}")
+                "timestamp": event_ts
+            }, severity=environmental_alert_severity(alert))
+            logger.debug("Env alert: %s", alert)
 
         # 3) Zone detection (requires DB id)
         try:
             if tid is not None:
                 z = await detect_zone_violation(app.state.db_sessionmaker, tid)
                 if z:
-                    await manager.broadcast({
+                    await alert_suppressor.submit(zone_alert_key(telemetry.get("auv_id"), z), {
                         "type": "zone_alert",
                         "data": z,
-                        "timestamp": datetime.now(timezone.utc).isoformat()
+                        "timestamp": event_ts
                     })
-                    print(f"Zone alert: {z}")
+                    logger.debug("Zone alert: %s", z)
         except Exception as e:
-            print(f"Zone detection error: {e}")
+            logger.error("Zone detection error: %s", e)
 
-    # Keep Listening to TELEMETRY WS URL
-    while True:
+    async def process_batches():
+        """Drain the telemetry queue in small batches so threshold checks run once per batch"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await telemetry_queue.get()]
+            deadline = loop.time() + TELEMETRY_BATCH_WINDOW_SECONDS
+            while len(batch) < TELEMETRY_BATCH_SIZE:
+                if not telemetry_queue.empty():
+                    batch.append(telemetry_queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(telemetry_queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # One timestamp per batch, shared by every alert it triggers
+            event_ts = datetime.now(timezone.utc).isoformat()
+            try:
+                alerts = env_monitor.check_thresholds_batch(batch, timestamp=event_ts)
+            except Exception as e:
+                # A malformed frame fails the whole batch check; re-check frame by frame below
+                logger.warning("Batch threshold check failed (%s); checking frames individually", e)
+                alerts = None
+            for i, telemetry in enumerate(batch):
+                # Nothing a single frame does may escape: the rest of the batch is already dequeued
+                try:
+                    if alerts is not None:
+                        alert = alerts[i]
+                    else:
+                        try:
+                            alert = env_monitor.check_thresholds(telemetry, timestamp=event_ts)
+                        except Exception as e:
+                            # Still persist the frame; it just can't raise an environmental alert
+                            logger.warning("Threshold check failed for telemetry frame: %s", e)
+                            alert = None
+                    await process_telemetry(telemetry, alert, event_ts)
+                except Exception as e:
+                    logger.exception("Telemetry processing error: %s", e)
+
+    def on_consumer_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Telemetry batch consumer stopped: %r", task.exception())
+
+    def start_consumer() -> asyncio.Task:
+        task = asyncio.create_task(process_batches())
+        task.add_done_callback(on_consumer_done)
+        return task
+
+    async def enqueue(telemetry: dict):
+        """Queue a frame for process_batches; raises if the consumer is gone so the reader reconnects"""
+        if batch_task.done():
+            raise RuntimeError("Telemetry batch consumer is not running")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(
+            telemetry_queue.put_nowait(telemetry)
+            return
+        except asyncio.QueueFull:
+            pass
+        # Queue full: wait for room, but never outlive the consumer
+        put = asyncio.ensure_future(telemetry_queue.put(telemetry))
+        await asyncio.wait({put, batch_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            raise RuntimeError("Telemetry batch consumer is not running")
+
+    batch_task = start_consumer()
+
+    # Keep Listening to TELEMETRY WS URL
+    try:
+        while True:
+            if batch_task.done():
+                logger.warning("Restarting telemetry batch consumer")
+                batch_task = start_consumer()
+            try:
+                async with app.state.http.ws_connect(
                     TELEMETRY_WS_URL,
                     heartbeat=30,  # Enable heartbeat every 30 seconds
                     timeout=aiohttp.ClientTimeout(total=60)
                 ) as ws:
-                    print("Connected to mock telemetry websocket")
-                    
+                    logger.info("Connected to mock telemetry websocket")
+                    attempt = 0
+                    _enable_tcp_keepalive(ws)
+
                     async for msg in ws:
                         if msg.type == aiohttp.WSMsgType.TEXT:
-                            print(f"Received message: {msg.data}")
+                            logger.debug("telemetry recv %d bytes", len(msg.data))
                             try:
-                                telemetry = json.loads(msg.data)
-                                await process_telemetry(telemetry) # Process Telemetry Data for Alerts
-                            except json.JSONDecodeError as e:
-                                print(f"Invalid JSON received: {e}")
+                                telemetry = orjson.loads(msg.data)
+                                if not isinstance(telemetry, dict):
+                                    logger.warning("Ignoring telemetry frame that is not a JSON object: %s", type(telemetry).__name__)
+                                    continue
+                                await enqueue(telemetry) # Processed in batches by process_batches
+                            except orjson.JSONDecodeError as e:
+                                logger.warning("Invalid JSON received: %s", e)
                         elif msg.type == aiohttp.WSMsgType.ERROR:
-                            print(f"WebSocket error: {ws.exception()}")
+                            logger.warning("WebSocket error: %s", ws.exception())
                             break
                         elif msg.type == aiohttp.WSMsgType.CLOSED:
-                            print("WebSocket connection closed")
+                            logger.info("WebSocket connection closed")
                             break
 
-        except aiohttp.ClientError as e:
-            print(f"Connection error: {e}")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-
-        print("Reconnecting to telemetry WebSocket...")
-        await asyncio.sleep(reconnect_delay)
+            except aiohttp.ClientError as e:
+                logger.warning("Connection error: %s", e)
+            except Exception as e:
+                logger.exception("Unexpected error: %s", e)
 
+            # Exponential backoff with full jitter so replicas don't reconnect in lockstep
+            delay = min(reconnect_max_delay, reconnect_base_delay * 2 ** min(attempt, 6)) * random.random()
+            attempt += 1
+            logger.info("Reconnecting to telemetry WebSocket in %.1fs...", delay)
+            await asyncio.sleep(delay)
+    finally:
+        batch_task.cancel()
 
 async def broadcast_dead_auv(app: FastAPI):
     """Background task to scan and broadcast dead AUV alerts."""
@@ -277,4 +502,4 @@ async def broadcast_dead_auv(app: FastAPI):
             "data": alert,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         })
-        print(f"Dead AUV alert: {alert}")
\ No newline at end of file
+        logger.info("Dead AUV alert: %s", alert)
\ No newline at end of file
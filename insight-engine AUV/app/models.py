@@ -5,7 +5,7 @@ SQLAlchemy ORM models for Insight Engine.
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Index, String, Integer, Float, DateTime, Text, func
+from sqlalchemy import Index, String, Integer, Float, DateTime, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -69,11 +69,20 @@ class Alert(Base):
 	__tablename__ = "alerts"
 
 	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-	auv_id: Mapped[str] = mapped_column(String(64), index=True)
-	type: Mapped[str] = mapped_column(String(64), index=True)  # environmental | zone_violation | dead_auv
+	auv_id: Mapped[str] = mapped_column(String(64))
+	type: Mapped[str] = mapped_column(String(64))  # environmental | zone_violation | dead_auv
 	severity: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
 	message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 	payload: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
 	status: Mapped[str] = mapped_column(String(16), default="active")  # active | resolved
 	started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 	ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+	# Keyset pagination for ORDER BY started_at DESC, id DESC (see migration 5e3b9d7a1c24);
+	# the composite indexes also serve plain auv_id / type lookups
+	__table_args__ = (
+		Index("ix_alerts_started_at_id", text("started_at DESC"), text("id DESC")),
+		Index("ix_alerts_auv_started_at_id", "auv_id", text("started_at DESC"), text("id DESC")),
+		Index("ix_alerts_type_started_at_id", "type", text("started_at DESC"), text("id DESC")),
+	)
+
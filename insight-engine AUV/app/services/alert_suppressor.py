@@ -0,0 +1,82 @@
+"""
+Alert flood suppression for WebSocket broadcasts.
+
+A stuck condition (e.g. temperature out of range) raises the same alert on every
+telemetry tick. The suppressor emits the first alert per key right away, counts
+repeats for the rest of the window, then emits one summary carrying `repeat_count`
+when the window closes. Keys include the alerting parameters (see the *_alert_key
+helpers) so distinct conditions never hide each other, and an alert more severe
+than any already emitted in its window (e.g. warning -> critical) goes out immediately.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+# threshold_type -> rank; higher ranks bypass an open window
+SEVERITY_RANK = {"warning": 1, "critical": 2}
+
+
+def environmental_alert_key(auv_id: Optional[str], alert: Dict[str, Any]) -> Tuple:
+    """Key an environmental alert record by AUV and the set of parameters it flags.
+
+    Severity is left out of the key so a warning -> critical change escalates within one window.
+    """
+    parameters = tuple(sorted({a.get("parameter") for a in alert.get("alerts", [])}, key=str))
+    return (auv_id, "environmental_alert", parameters)
+
+
+def environmental_alert_severity(alert: Dict[str, Any]) -> int:
+    """Highest severity rank among the parameter alerts of a record."""
+    return max((SEVERITY_RANK.get(a.get("threshold_type"), 0) for a in alert.get("alerts", [])), default=0)
+
+
+def zone_alert_key(auv_id: Optional[str], zone: Dict[str, Any]) -> Tuple:
+    """Key a zone alert by AUV, zone and violation kind."""
+    return (auv_id, "zone_alert", zone.get("zone_id"), zone.get("violation"))
+
+
+class _Window:
+    __slots__ = ("count", "last_message", "severity")
+
+    def __init__(self, severity: int):
+        self.count = 0  # repeats suppressed in this window
+        self.last_message: Optional[Dict[str, Any]] = None
+        self.severity = severity  # highest severity emitted in this window
+
+
+class AlertSuppressor:
+    def __init__(self, emit: Callable[[Dict[str, Any]], Awaitable[None]], window_seconds: float = 30.0):
+        self.emit = emit
+        self.window_seconds = window_seconds
+        self._windows: Dict[Hashable, _Window] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, message: Dict[str, Any], severity: int = 0) -> bool:
+        """Emit `message` unless `key` already fired within the window at the same or higher severity.
+        Returns True if the message was emitted, False if it was suppressed.
+        """
+        window = self._windows.get(key)
+        if window is not None:
+            if severity > window.severity:
+                # Escalation: never hold back a more severe alert
+                window.severity = severity
+                await self.emit(message)
+                return True
+            window.count += 1
+            window.last_message = message
+            return False
+
+        self._windows[key] = _Window(severity)
+        asyncio.get_running_loop().call_later(self.window_seconds, self._close_window, key)
+        await self.emit(message)
+        return True
+
+    def _close_window(self, key: Hashable) -> None:
+        window = self._windows.pop(key, None)
+        if window is None or not window.count:
+            return
+        summary = {**window.last_message, "repeat_count": window.count}
+        task = asyncio.create_task(self.emit(summary))
+        # Keep a reference until done so the task isn't garbage collected mid-flight
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
@@ -1,63 +1,72 @@
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+# telemetry key -> alert parameter name
+_MONITORED_PARAMETERS = (
+    ("temperature_c", "temperature"),
+    ("turbidity", "turbidity"),
+)
 
 class EnvironmentalMonitor:
     def __init__(self, thresholds: Dict):
         self.thresholds = thresholds
+        # Flatten threshold lookups once: (key, parameter, crit_min, crit_max, warn_min, warn_max, crit_limits, warn_limits)
+        self._rules = [
+            (
+                key,
+                parameter,
+                thresholds[key]["critical"]["min"],
+                thresholds[key]["critical"]["max"],
+                thresholds[key]["warning"]["min"],
+                thresholds[key]["warning"]["max"],
+                thresholds[key]["critical"],
+                thresholds[key]["warning"],
+            )
+            for key, parameter in _MONITORED_PARAMETERS
+        ]
 
-    def check_thresholds(self, telemetry: Dict) -> Optional[Dict]:
+    def check_thresholds(self, telemetry: Dict, timestamp: Optional[str] = None) -> Optional[Dict]:
         """
         Check if telemetry data exceeds environmental thresholds
         Returns an alert if thresholds are exceeded, None otherwise
+        `timestamp` lets the caller reuse an already formatted ISO time for the alert record
         """
         alerts = []
-        
-        # Check temperature
-        if "temperature_c" in telemetry:
-            temp = telemetry["temperature_c"]
-            temp_thresholds = self.thresholds["temperature_c"]
-            
-            if temp < temp_thresholds["critical"]["min"] or temp > temp_thresholds["critical"]["max"]:
-                alerts.append({
-                    "parameter": "temperature",
-                    "value": temp,
-                    "threshold_type": "critical",
-                    "limits": temp_thresholds["critical"]
-                })
-            elif temp < temp_thresholds["warning"]["min"] or temp > temp_thresholds["warning"]["max"]:
-                alerts.append({
-                    "parameter": "temperature",
-                    "value": temp,
-                    "threshold_type": "warning",
-                    "limits": temp_thresholds["warning"]
-                })
 
-        # Check turbidity
-        if "turbidity" in telemetry:
-            turbidity = telemetry["turbidity"]
-            turbidity_thresholds = self.thresholds["turbidity"]
-            
-            if turbidity < turbidity_thresholds["critical"]["min"] or turbidity > turbidity_thresholds["critical"]["max"]:
+        for key, parameter, crit_min, crit_max, warn_min, warn_max, crit_limits, warn_limits in self._rules:
+            value = telemetry.get(key)
+            if value is None:  # missing or null reading
+                continue
+            if value < crit_min or value > crit_max:
                 alerts.append({
-                    "parameter": "turbidity",
-                    "value": turbidity,
+                    "parameter": parameter,
+                    "value": value,
                     "threshold_type": "critical",
-                    "limits": turbidity_thresholds["critical"]
+                    "limits": crit_limits
                 })
-            elif turbidity < turbidity_thresholds["warning"]["min"] or turbidity > turbidity_thresholds["warning"]["max"]:
+            elif value < warn_min or value > warn_max:
                 alerts.append({
-                    "parameter": "turbidity",
-                    "value": turbidity,
+                    "parameter": parameter,
+                    "value": value,
                     "threshold_type": "warning",
-                    "limits": turbidity_thresholds["warning"]
+                    "limits": warn_limits
                 })
 
         if alerts:
             alert_record = {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
                 "auv_id": telemetry.get("auv_id"),
                 "alerts": alerts
             }
             return alert_record
-            
-        return None
\ No newline at end of file
+
+        return None
+
+    def check_thresholds_batch(self, telemetries: List[Dict], timestamp: Optional[str] = None) -> List[Optional[Dict]]:
+        """
+        Check a batch of telemetry frames; returns one entry (alert or None) per frame, in order
+        A single timestamp is shared by every alert in the batch
+        """
+        timestamp = timestamp or datetime.now(timezone.utc).isoformat()
+        check = self.check_thresholds
+        return [check(t, timestamp) for t in telemetries]
@@ -6,11 +6,13 @@ Phase 2 (later): add per-AUV telemetry time-series (temperature, depth_m, locati
 This keeps implementation minimal for frontend to start consuming alert streams.
 """
 
+import asyncio
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple, Iterable
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Iterable, Tuple
 
-from sqlalchemy import text
+from sqlalchemy import TextClause, text
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
 ALERT_TYPES = {"environmental", "zone_violation", "dead_auv"}
@@ -32,26 +34,171 @@ class InsightParams:
     cursor: Optional[str] = None  # pagination cursor "<iso>|<id>"
 
 
-def _parse_point_wkt(wkt: Optional[str]) -> Optional[Tuple[float, float]]:
-    if not wkt:
-        return None
-    # Expected format: POINT(lon lat)
-    wkt = wkt.strip()
-    if not wkt.upper().startswith("POINT(") or not wkt.endswith(")"):
-        return None
-    inner = wkt[wkt.find("(") + 1 : -1]
-    parts = inner.replace(",", " ").split()
-    if len(parts) != 2:
-        return None
-    try:
-        lon = float(parts[0])
-        lat = float(parts[1])
-        return lon, lat
-    except ValueError:
-        return None
+# Identical dashboard polls within this window share one DB result
+INSIGHTS_CACHE_TTL_SECONDS = 1.0
+INSIGHTS_CACHE_MAXSIZE = 1024
+
+# Rows fetched per server-side cursor round-trip; smaller results use a single execute()
+STREAM_YIELD_PER = 200
+
+# Static query; built once at import and reused for every request.
+# lon/lat are projected from the PostGIS geom column server-side (no WKT parsing in Python).
+_TIMESERIES_SQL = text(
+    """
+    SELECT timestamp, temperature_c, depth_m, velocity_knots, ST_X(geom) AS lon, ST_Y(geom) AS lat
+    FROM telemetry
+    WHERE auv_id = :auv_id AND timestamp >= :window_start
+    ORDER BY timestamp ASC
+    LIMIT :ts_limit
+    """
+)
+
+
+def _make_point_projector(fields: Iterable[str]) -> Callable[[Any], Dict[str, Any]]:
+    """Build a row -> point dict function specialised for the requested fields.
+
+    Field selection is resolved once per request rather than re-checked for every row.
+    """
+    scalar_fields = tuple(f for f in ("temperature_c", "depth_m", "velocity_knots") if f in fields)
+
+    def project_scalars(row: Any) -> Dict[str, Any]:
+        pt: Dict[str, Any] = {"timestamp": row.timestamp.isoformat() if row.timestamp else None}
+        for f in scalar_fields:
+            pt[f] = getattr(row, f)
+        return pt
+
+    if "location" not in fields:
+        return project_scalars
+
+    def project_with_location(row: Any) -> Dict[str, Any]:
+        pt = project_scalars(row)
+        pt["location"] = {"lon": row.lon, "lat": row.lat} if row.lon is not None else None
+        return pt
+
+    return project_with_location
+
+
+# WHERE fragments per filter name; insertion order fixes the SQL text for each filter combination
+_ALERT_FILTERS: Dict[str, str] = {
+    "auv_id": "auv_id = :auv_id",
+    "type": "type = :type",
+    "since": "started_at > :since",
+    "cursor": "(started_at < :cursor_started_at OR (started_at = :cursor_started_at AND id < :cursor_id))",
+}
+
+# Compiled statements keyed by (query, active filter names); at most 2^4 + 2^2 entries
+_STMT_CACHE: Dict[Tuple[str, FrozenSet[str]], TextClause] = {}
+
+
+def _where(active: FrozenSet[str]) -> str:
+    filters = [sql for name, sql in _ALERT_FILTERS.items() if name in active]
+    return ("WHERE " + " AND ".join(filters)) if filters else ""
+
+
+def _alerts_stmt(active: FrozenSet[str]) -> TextClause:
+    """Return the cached alerts listing statement for the given active filters."""
+    key = ("alerts", active)
+    stmt = _STMT_CACHE.get(key)
+    if stmt is None:
+        stmt = _STMT_CACHE[key] = text(
+            f"""
+            SELECT id, auv_id, type, severity, status, message, started_at
+            FROM alerts
+            {_where(active)}
+            ORDER BY started_at DESC, id DESC
+            LIMIT :limit
+            """
+        )
+    return stmt
+
+
+def _stats_stmt(active: FrozenSet[str]) -> TextClause:
+    """Return the cached stats statement; ROLLUP adds a grand-total row next to per-type counts."""
+    key = ("stats", active)
+    stmt = _STMT_CACHE.get(key)
+    if stmt is None:
+        stmt = _STMT_CACHE[key] = text(
+            f"""
+            SELECT
+              type,
+              GROUPING(type) = 1 AS is_total,
+              COUNT(*) AS c,
+              MAX(started_at) AS latest_alert,
+              SUM(CASE WHEN started_at >= :window_start THEN 1 ELSE 0 END) AS alerts_in_window
+            FROM alerts
+            {_where(active)}
+            GROUP BY ROLLUP(type)
+            """
+        )
+    return stmt
+
+
+_insights_cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}  # key -> (expires_at, response)
+_insights_locks: Dict[Tuple, asyncio.Lock] = {}
+_insights_lock_users: Dict[Tuple, int] = {}  # key -> callers holding or waiting on its lock
+
+
+def _cache_key(p: InsightParams) -> Tuple:
+    """Canonical cache key for a request (timeseries_fields order is kept; it shapes the response)."""
+    return (
+        p.auv_id,
+        p.type,
+        p.limit,
+        p.summary,
+        tuple(sorted(p.summary_modes or [])),
+        p.window_minutes,
+        p.timeseries_limit,
+        tuple(p.timeseries_fields or []),
+        p.since,
+    )
+
+
+def _cache_put(key: Tuple, data: Dict[str, Any]) -> None:
+    now = time.monotonic()
+    if len(_insights_cache) >= INSIGHTS_CACHE_MAXSIZE:
+        for k in [k for k, (exp, _) in _insights_cache.items() if exp <= now]:
+            del _insights_cache[k]
+        if len(_insights_cache) >= INSIGHTS_CACHE_MAXSIZE:
+            # Still full: evict the oldest insertion
+            del _insights_cache[next(iter(_insights_cache))]
+    _insights_cache[key] = (now + INSIGHTS_CACHE_TTL_SECONDS, data)
 
 
 async def fetch_insights(session_factory: async_sessionmaker[AsyncSession], insight_params: InsightParams) -> Dict[str, Any]:
+    """Return recent alerts plus optional summaries, served from a short TTL cache.
+
+    Concurrent identical requests wait on a per-key lock so only one hits the DB.
+    Paginated requests (cursor set) always bypass the cache.
+    """
+    if insight_params.cursor:
+        return await _fetch_insights(session_factory, insight_params)
+
+    key = _cache_key(insight_params)
+    hit = _insights_cache.get(key)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+
+    lock = _insights_locks.setdefault(key, asyncio.Lock())
+    _insights_lock_users[key] = _insights_lock_users.get(key, 0) + 1
+    try:
+        async with lock:
+            hit = _insights_cache.get(key)
+            if hit and hit[0] > time.monotonic():
+                return hit[1]
+            data = await _fetch_insights(session_factory, insight_params)
+            _cache_put(key, data)
+            return data
+    finally:
+        # lock.locked() is already False while woken waiters are still queued, so count users instead
+        remaining = _insights_lock_users[key] - 1
+        if remaining:
+            _insights_lock_users[key] = remaining
+        else:
+            del _insights_lock_users[key]
+            del _insights_locks[key]
+
+
+async def _fetch_insights(session_factory: async_sessionmaker[AsyncSession], insight_params: InsightParams) -> Dict[str, Any]:
     """Return recent alerts plus optional summaries.
 
     Summaries selected via summary_modes (list). Supported modes:
@@ -71,43 +218,42 @@ async def fetch_insights(session_factory: async_sessionmaker[AsyncSession], insi
     modes = [m for m in modes if m in SUMMARY_MODES_ALLOWED]
 
     # Filter & paginate Alerts
-    filters: List[str] = []
+    active: List[str] = []
     params: Dict[str, Any] = {"limit": insight_params.limit}
     if insight_params.auv_id:
-        filters.append("auv_id = :auv_id")
+        active.append("auv_id")
         params["auv_id"] = insight_params.auv_id
     if insight_params.type:
-        filters.append("type = :type")
+        active.append("type")
         params["type"] = insight_params.type
     if insight_params.since:
-        filters.append("started_at > :since")
+        active.append("since")
         params["since"] = insight_params.since
     if insight_params.cursor:
         try:
             c_time, c_id = insight_params.cursor.split("|", 1)
             c_dt = datetime.fromisoformat(c_time)
             c_id_int = int(c_id)
-            filters.append("(started_at < :cursor_started_at OR (started_at = :cursor_started_at AND id < :cursor_id))")
+            active.append("cursor")
             params["cursor_started_at"] = c_dt
             params["cursor_id"] = c_id_int
         except Exception:
             pass
-    where_clause = ("WHERE " + " AND ".join(filters)) if filters else ""    
-    sql = text(
-        f"""
-        SELECT auv_id, type, severity, status, message, started_at
-        FROM alerts
-        {where_clause}
-        ORDER BY started_at DESC, id DESC
-        LIMIT :limit
-        """
-    )
+    sql = _alerts_stmt(frozenset(active))
     alerts: List[Dict[str, Any]] = []
     next_cursor: Optional[str] = None
+    out: Dict[str, Any] = {"alerts": alerts}
+    # Single session for alerts and all summaries: one checkout per request
     async with session_factory() as session:
+        # limit is capped well below STREAM_YIELD_PER, so a plain execute() is a single round trip
         res = await session.execute(sql, params)
-        rows = res.fetchall()
-        for r in rows:
+        row_count = 0
+        last_id: Optional[int] = None
+        started_iso: Optional[str] = None
+        for r in res:
+            row_count += 1
+            last_id = r.id
+            started_iso = r.started_at.isoformat() if r.started_at else None
             alerts.append(
                 {
                     "auv_id": r.auv_id,
@@ -115,111 +261,78 @@ async def fetch_insights(session_factory: async_sessionmaker[AsyncSession], insi
                     "severity": r.severity,
                     "status": r.status,
                     "message": r.message,
-                    "started_at": r.started_at.isoformat() if r.started_at else None,
+                    "started_at": started_iso,
                 }
             )
-        if rows and len(rows) == insight_params.limit:
-            last = rows[-1]
-            if last.started_at is not None:
-                next_cursor = f"{last.started_at.isoformat()}|{last.id}"
+        if row_count and row_count == insight_params.limit:
+            # started_iso still holds the last row's formatted timestamp
+            if started_iso is not None:
+                next_cursor = f"{started_iso}|{last_id}"
 
-    out: Dict[str, Any] = {"alerts": alerts}
-    if next_cursor:
-        out["pagination"] = {"next_cursor": next_cursor}
-    if not modes: 
-        return out
-
-    # If Summary Mode is passed
-    summaries: Dict[str, Any] = {}
-    window_start = datetime.now(timezone.utc) - timedelta(minutes=insight_params.window_minutes)
-
-    if "timeseries" in modes:
-        if not insight_params.auv_id:
-            summaries["timeseries_error"] = "timeseries summary requires auv_id"
-        else:
-            if insight_params.timeseries_fields:
-                requested_fields: Iterable[str] = [f for f in insight_params.timeseries_fields if f in TIMESERIES_ALLOWED_FIELDS]
+        if next_cursor:
+            out["pagination"] = {"next_cursor": next_cursor}
+        if not modes:
+            return out
+
+        # If Summary Mode is passed
+        summaries: Dict[str, Any] = {}
+        window_start = datetime.now(timezone.utc) - timedelta(minutes=insight_params.window_minutes)
+
+        if "timeseries" in modes:
+            if not insight_params.auv_id:
+                summaries["timeseries_error"] = "timeseries summary requires auv_id"
             else:
-                requested_fields = list(TIMESERIES_ALLOWED_FIELDS)
-            ts_sql = text(
-                """
-                SELECT timestamp, temperature_c, depth_m, velocity_knots, location_wkt
-                FROM telemetry
-                WHERE auv_id = :auv_id AND timestamp >= :window_start
-                ORDER BY timestamp ASC
-                LIMIT :ts_limit
-                """
-            )
-            ts_params = {
-                "auv_id": insight_params.auv_id,
-                "window_start": window_start,
-                "ts_limit": insight_params.timeseries_limit,
-            }
-            points: List[Dict[str, Any]] = []
-            async with session_factory() as session:
-                res_ts = await session.execute(ts_sql, ts_params)
-                for row in res_ts.fetchall():
-                    ll = _parse_point_wkt(row.location_wkt)
-                    loc = {"lon": ll[0], "lat": ll[1]} if ll else None
-                    pt: Dict[str, Any] = {"timestamp": row.timestamp.isoformat() if row.timestamp else None}
-                    if "temperature_c" in requested_fields:
-                        pt["temperature_c"] = row.temperature_c
-                    if "depth_m" in requested_fields:
-                        pt["depth_m"] = row.depth_m
-                    if "velocity_knots" in requested_fields:
-                        pt["velocity_knots"] = row.velocity_knots
-                    if "location" in requested_fields:
-                        pt["location"] = loc
-                    points.append(pt)
-            summaries["timeseries"] = {
-                "auv_id": insight_params.auv_id,
-                "window_minutes": insight_params.window_minutes,
-                "fields": list(requested_fields),
-                "points": points,
-                "count": len(points),
-            }
+                if insight_params.timeseries_fields:
+                    requested_fields: Iterable[str] = [f for f in insight_params.timeseries_fields if f in TIMESERIES_ALLOWED_FIELDS]
+                else:
+                    requested_fields = list(TIMESERIES_ALLOWED_FIELDS)
+                ts_params = {
+                    "auv_id": insight_params.auv_id,
+                    "window_start": window_start,
+                    "ts_limit": insight_params.timeseries_limit,
+                }
+                project = _make_point_projector(requested_fields)
+                if insight_params.timeseries_limit > STREAM_YIELD_PER:
+                    # Only worth a server-side cursor when the result spans several fetches
+                    res_ts = await session.stream(_TIMESERIES_SQL, ts_params, execution_options={"yield_per": STREAM_YIELD_PER})
+                    points: List[Dict[str, Any]] = [project(row) async for row in res_ts]
+                else:
+                    res_ts = await session.execute(_TIMESERIES_SQL, ts_params)
+                    points = [project(row) for row in res_ts]
+                summaries["timeseries"] = {
+                    "auv_id": insight_params.auv_id,
+                    "window_minutes": insight_params.window_minutes,
+                    "fields": list(requested_fields),
+                    "points": points,
+                    "count": len(points),
+                }
 
-    if "stats" in modes:
-        # Lightweight aggregate over alerts (respecting filters for auv_id / type)
-        stats_filters: List[str] = []
-        stats_params: Dict[str, Any] = {"window_start": window_start}
-        if insight_params.auv_id:
-            stats_filters.append("auv_id = :auv_id")
-            stats_params["auv_id"] = insight_params.auv_id
-        if insight_params.type:
-            stats_filters.append("type = :type")
-            stats_params["type"] = insight_params.type
-        stats_where = ("WHERE " + " AND ".join(stats_filters)) if stats_filters else ""
-        stats_sql = text(
-            f"""
-            SELECT
-              COUNT(*) AS total_alerts,
-              MAX(started_at) AS latest_alert,
-              SUM(CASE WHEN started_at >= :window_start THEN 1 ELSE 0 END) AS alerts_in_window
-            FROM alerts
-            {stats_where}
-            """
-        )
-        by_type_sql = text(
-            f"""
-            SELECT type, COUNT(*) AS c
-            FROM alerts
-            {stats_where}
-            GROUP BY type
-            """
-        )
-        async with session_factory() as session:
+        if "stats" in modes:
+            # Lightweight aggregate over alerts (respecting filters for auv_id / type)
+            stats_active: List[str] = []
+            stats_params: Dict[str, Any] = {"window_start": window_start}
+            if insight_params.auv_id:
+                stats_active.append("auv_id")
+                stats_params["auv_id"] = insight_params.auv_id
+            if insight_params.type:
+                stats_active.append("type")
+                stats_params["type"] = insight_params.type
+            stats_sql = _stats_stmt(frozenset(stats_active))
             res_stats = await session.execute(stats_sql, stats_params)
-            row_s = res_stats.first()
-            res_bt = await session.execute(by_type_sql, stats_params)
-            alerts_by_type = {r.type: r.c for r in res_bt.fetchall()}
-        summaries["stats"] = {
-            "window_minutes": insight_params.window_minutes,
-            "total_alerts": (row_s.total_alerts if row_s else 0),
-            "alerts_in_window": (row_s.alerts_in_window if row_s else 0),
-            "latest_alert_timestamp": row_s.latest_alert.isoformat() if row_s and row_s.latest_alert else None,
-            "alerts_by_type": alerts_by_type,
-        }
+            row_s = None
+            alerts_by_type: Dict[str, int] = {}
+            for r in res_stats.fetchall():
+                if r.is_total:
+                    row_s = r
+                else:
+                    alerts_by_type[r.type] = r.c
+            summaries["stats"] = {
+                "window_minutes": insight_params.window_minutes,
+                "total_alerts": (row_s.c if row_s else 0),
+                "alerts_in_window": (row_s.alerts_in_window if row_s else 0),
+                "latest_alert_timestamp": row_s.latest_alert.isoformat() if row_s and row_s.latest_alert else None,
+                "alerts_by_type": alerts_by_type,
+            }
 
     out["summaries"] = summaries
     return out
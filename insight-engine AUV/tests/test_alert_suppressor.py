@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from app.services.alert_suppressor import (
+    AlertSuppressor,
+    environmental_alert_key,
+    environmental_alert_severity,
+    zone_alert_key,
+)
+
+WINDOW = 0.05
+
+
+def _env_alert(*conditions):
+    return {"auv_id": "AUV_1", "alerts": [{"parameter": p, "threshold_type": t} for p, t in conditions]}
+
+
+async def _submit_env(suppressor, alert):
+    return await suppressor.submit(
+        environmental_alert_key("AUV_1", alert),
+        {"type": "environmental_alert", "data": alert},
+        severity=environmental_alert_severity(alert),
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeats_collapse_into_one_summary():
+    emitted = []
+
+    async def emit(msg):
+        emitted.append(msg)
+
+    suppressor = AlertSuppressor(emit, window_seconds=WINDOW)
+    alert = _env_alert(("temperature", "warning"))
+    assert await _submit_env(suppressor, alert) is True
+    assert await _submit_env(suppressor, alert) is False
+    assert await _submit_env(suppressor, alert) is False
+    assert len(emitted) == 1 and "repeat_count" not in emitted[0]
+
+    await asyncio.sleep(WINDOW * 3)
+    assert len(emitted) == 2
+    assert emitted[1]["repeat_count"] == 2
+
+    # A new window opens after the summary
+    assert await _submit_env(suppressor, alert) is True
+
+
+@pytest.mark.asyncio
+async def test_distinct_parameters_are_never_hidden():
+    emitted = []
+
+    async def emit(msg):
+        emitted.append(msg)
+
+    suppressor = AlertSuppressor(emit, window_seconds=WINDOW)
+    temp = _env_alert(("temperature", "warning"))
+    turbidity = _env_alert(("turbidity", "warning"))
+    both = _env_alert(("temperature", "warning"), ("turbidity", "warning"))
+    for alert in (temp, turbidity, both):
+        assert await _submit_env(suppressor, alert) is True
+
+    assert [m["data"] for m in emitted] == [temp, turbidity, both]
+    await asyncio.sleep(WINDOW * 3)
+    assert len(emitted) == 3  # nothing was suppressed, so no summaries
+
+
+@pytest.mark.asyncio
+async def test_warning_escalating_to_critical_is_emitted_immediately():
+    emitted = []
+
+    async def emit(msg):
+        emitted.append(msg)
+
+    suppressor = AlertSuppressor(emit, window_seconds=WINDOW)
+    warning_temp = _env_alert(("temperature", "warning"))
+    critical_temp = _env_alert(("temperature", "critical"))
+    assert await _submit_env(suppressor, warning_temp) is True
+    assert await _submit_env(suppressor, critical_temp) is True
+    # Back to warning (or critical again) within the same window is a repeat
+    assert await _submit_env(suppressor, critical_temp) is False
+    assert await _submit_env(suppressor, warning_temp) is False
+
+    assert [m["data"] for m in emitted] == [warning_temp, critical_temp]
+    await asyncio.sleep(WINDOW * 3)
+    assert emitted[-1]["repeat_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_higher_severity_bypasses_open_window():
+    emitted = []
+
+    async def emit(msg):
+        emitted.append(msg)
+
+    suppressor = AlertSuppressor(emit, window_seconds=WINDOW)
+    assert await suppressor.submit("k", {"n": 1}, severity=1) is True
+    assert await suppressor.submit("k", {"n": 2}, severity=2) is True
+    assert await suppressor.submit("k", {"n": 3}, severity=2) is False
+    assert await suppressor.submit("k", {"n": 4}, severity=1) is False
+    assert [m["n"] for m in emitted] == [1, 2]
+
+    await asyncio.sleep(WINDOW * 3)
+    assert emitted[-1] == {"n": 4, "repeat_count": 2}
+
+
+def test_keys():
+    assert environmental_alert_key("A", _env_alert(("turbidity", "warning"), ("temperature", "critical"))) == \
+        environmental_alert_key("A", _env_alert(("temperature", "critical"), ("turbidity", "warning")))
+    assert environmental_alert_key("A", _env_alert(("temperature", "warning"))) == \
+        environmental_alert_key("A", _env_alert(("temperature", "critical")))
+    assert environmental_alert_severity(_env_alert(("turbidity", "warning"), ("temperature", "critical"))) == 2
+    assert zone_alert_key("A", {"zone_id": "Z1", "violation": "outside"}) != \
+        zone_alert_key("A", {"zone_id": "Z2", "violation": "outside"})
@@ -0,0 +1,152 @@
+import asyncio
+
+import orjson
+import pytest
+from starlette.websockets import WebSocketState
+
+import app.main as main
+from app.main import ConnectionManager, ShardedConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, fail_with: Exception | None = None, block: bool = False):
+        self.sent = []
+        self.fail_with = fail_with
+        self.close_codes = []
+        self.client_state = WebSocketState.CONNECTED
+        self.unblock = asyncio.Event()
+        if not block:
+            self.unblock.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        await self.unblock.wait()
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000):
+        self.close_codes.append(code)
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_every_client_through_its_writer():
+    manager = ConnectionManager()
+    a, b = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(a)
+    await manager.connect(b)
+
+    manager.publish("m1")
+    manager.publish("m2")
+    await _settle()
+
+    assert a.sent == ["m1", "m2"] and b.sent == ["m1", "m2"]
+    await manager.disconnect(a)
+    await manager.disconnect(b)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_oldest_message(monkeypatch):
+    monkeypatch.setattr(main, "OUTBOX_MAXSIZE", 2)
+    manager = ConnectionManager()
+    slow = FakeWebSocket(block=True)
+    await manager.connect(slow)
+
+    manager.publish("m1")
+    await _settle()  # writer takes m1 and blocks in send_text
+    for msg in ("m2", "m3", "m4"):
+        manager.publish(msg)  # queue holds 2: m2 is evicted by m4
+
+    slow.unblock.set()
+    await _settle()
+    assert slow.sent == ["m1", "m3", "m4"]
+    await manager.disconnect(slow)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [ConnectionError("gone"), ValueError("unexpected")])
+async def test_send_failure_disconnects_client(error):
+    manager = ConnectionManager()
+    broken, healthy = FakeWebSocket(fail_with=error), FakeWebSocket()
+    await manager.connect(broken)
+    await manager.connect(healthy)
+    writer = manager._writers[broken]
+
+    manager.publish("m1")
+    await _settle()
+
+    assert broken not in manager.active_connections
+    assert broken not in manager._writers
+    # The writer unregistered itself and finished normally instead of cancelling itself
+    assert writer.done() and not writer.cancelled() and writer.exception() is None
+    assert healthy.sent == ["m1"]
+    assert broken.close_codes == [1011] and healthy.close_codes == []
+    await manager.disconnect(healthy)
+
+
+@pytest.mark.asyncio
+async def test_send_timeout_closes_slow_client(monkeypatch):
+    monkeypatch.setattr(main, "SEND_TIMEOUT_SECONDS", 0.01)
+    manager = ConnectionManager()
+    stuck = FakeWebSocket(block=True)
+    await manager.connect(stuck)
+
+    manager.publish("m1")
+    for _ in range(50):
+        if stuck.close_codes:
+            break
+        await asyncio.sleep(0.01)
+
+    assert stuck.close_codes == [1011]
+    assert stuck not in manager.active_connections
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_writer_and_clears_queue():
+    manager = ConnectionManager()
+    slow = FakeWebSocket(block=True)
+    await manager.connect(slow)
+    queue = manager.active_connections[slow]
+    writer = manager._writers[slow]
+    for msg in ("m1", "m2", "m3"):
+        manager.publish(msg)
+    await _settle()
+
+    await manager.disconnect(slow)
+    await _settle()
+
+    assert writer.cancelled()
+    assert slow.close_codes == []  # an explicit disconnect leaves closing to the endpoint
+    assert queue.empty()
+    assert slow not in manager.active_connections
+    # Disconnecting twice is harmless
+    await manager.disconnect(slow)
+
+
+@pytest.mark.asyncio
+async def test_sharded_broadcast_serializes_once_for_all_shards(monkeypatch):
+    manager = ShardedConnectionManager(shards=4)
+    clients = [FakeWebSocket() for _ in range(10)]
+    for ws in clients:
+        await manager.connect(ws)
+
+    calls = []
+    real_dumps = orjson.dumps
+    monkeypatch.setattr(main.orjson, "dumps", lambda obj: calls.append(obj) or real_dumps(obj))
+    await manager.broadcast({"type": "ping"})
+    await _settle()
+
+    assert len(calls) == 1
+    assert all(ws.sent == ['{"type":"ping"}'] for ws in clients)
+    assert sum(len(s.active_connections) for s in manager.shards) == len(clients)
+    for ws in clients:
+        await manager.disconnect(ws)
+    assert all(not s.active_connections for s in manager.shards)
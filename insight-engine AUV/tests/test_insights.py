@@ -0,0 +1,213 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import insights
+from app.services.insights import InsightParams
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __aiter__(self):
+        self._it = iter(self._rows)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeSession:
+    """Answers the alerts/stats/timeseries queries from canned rows, recording each call."""
+
+    def __init__(self, alerts=(), stats=(), timeseries=()):
+        self.alerts, self.stats, self.timeseries = alerts, stats, timeseries
+        self.calls = []
+        self.methods = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def _rows_for(self, sql):
+        text = str(sql)
+        if "ROLLUP" in text:
+            return self.stats
+        if "FROM telemetry" in text:
+            return self.timeseries
+        return self.alerts
+
+    async def execute(self, sql, params=None, **kw):
+        self.calls.append(str(sql))
+        self.methods.append("execute")
+        return _Rows(self._rows_for(sql))
+
+    async def stream(self, sql, params=None, **kw):
+        self.calls.append(str(sql))
+        self.methods.append("stream")
+        return _Rows(self._rows_for(sql))
+
+
+@pytest.fixture(autouse=True)
+def _clear_insights_cache():
+    insights._insights_cache.clear()
+    yield
+    insights._insights_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_stats_rollup_rows_split_into_total_and_per_type():
+    latest = datetime(2025, 8, 12, 10, 0, tzinfo=timezone.utc)
+    session = FakeSession(stats=[
+        SimpleNamespace(type="environmental", is_total=False, c=3, latest_alert=latest, alerts_in_window=2),
+        SimpleNamespace(type="dead_auv", is_total=False, c=1, latest_alert=latest, alerts_in_window=0),
+        SimpleNamespace(type=None, is_total=True, c=4, latest_alert=latest, alerts_in_window=2),
+    ])
+
+    out = await insights.fetch_insights(session, InsightParams(summary_modes=["stats"], window_minutes=30))
+
+    assert out["summaries"]["stats"] == {
+        "window_minutes": 30,
+        "total_alerts": 4,
+        "alerts_in_window": 2,
+        "latest_alert_timestamp": latest.isoformat(),
+        "alerts_by_type": {"environmental": 3, "dead_auv": 1},
+    }
+    # Alerts and the merged stats query share one session: two statements in total
+    assert len(session.calls) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ts_limit, expected", [(30, ["execute", "execute"]), (500, ["execute", "stream"])])
+async def test_timeseries_streams_only_when_larger_than_one_fetch(ts_limit, expected):
+    ts = datetime(2025, 8, 12, 10, 0, tzinfo=timezone.utc)
+    session = FakeSession(timeseries=[
+        SimpleNamespace(timestamp=ts, temperature_c=11.5, depth_m=40.0, velocity_knots=2.1, lon=None, lat=None),
+    ])
+    params = InsightParams(auv_id="AUV-1", summary_modes=["timeseries"], timeseries_limit=ts_limit)
+
+    out = await insights.fetch_insights(session, params)
+
+    assert session.methods == expected
+    assert out["summaries"]["timeseries"]["count"] == 1
+
+
+def test_point_projector_emits_only_requested_fields():
+    ts = datetime(2025, 8, 12, 10, 0, tzinfo=timezone.utc)
+    row = SimpleNamespace(timestamp=ts, temperature_c=11.5, depth_m=40.0, velocity_knots=2.1, lon=10.0, lat=20.0)
+
+    project = insights._make_point_projector(["depth_m"])
+
+    assert project(row) == {"timestamp": ts.isoformat(), "depth_m": 40.0}
+
+
+def test_point_projector_adds_location_from_lon_lat():
+    ts = datetime(2025, 8, 12, 10, 0, tzinfo=timezone.utc)
+    project = insights._make_point_projector(["temperature_c", "location"])
+
+    assert project(SimpleNamespace(timestamp=ts, temperature_c=11.5, lon=10.0, lat=20.0)) == {
+        "timestamp": ts.isoformat(),
+        "temperature_c": 11.5,
+        "location": {"lon": 10.0, "lat": 20.0},
+    }
+    assert project(SimpleNamespace(timestamp=None, temperature_c=None, lon=None, lat=None)) == {
+        "timestamp": None,
+        "temperature_c": None,
+        "location": None,
+    }
+
+
+@pytest.fixture
+def counted_fetch(monkeypatch):
+    calls = []
+
+    async def fake_fetch(session_factory, insight_params):
+        calls.append(insight_params)
+        await asyncio.sleep(0.01)
+        return {"call": len(calls)}
+
+    monkeypatch.setattr(insights, "_fetch_insights", fake_fetch)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_repeat_request_is_served_from_cache(counted_fetch):
+    params = InsightParams(auv_id="AUV-1")
+
+    first = await insights.fetch_insights(FakeSession(), params)
+    second = await insights.fetch_insights(FakeSession(), InsightParams(auv_id="AUV-1"))
+
+    assert first == second == {"call": 1}
+    assert len(counted_fetch) == 1
+    assert insights._insights_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_fetch(counted_fetch):
+    results = await asyncio.gather(*(insights.fetch_insights(FakeSession(), InsightParams(auv_id="AUV-1")) for _ in range(5)))
+
+    assert results == [{"call": 1}] * 5
+    assert len(counted_fetch) == 1
+
+
+@pytest.mark.asyncio
+async def test_cursor_requests_bypass_cache(counted_fetch):
+    params = InsightParams(auv_id="AUV-1", cursor="2025-08-12T10:00:00+00:00|42")
+
+    await insights.fetch_insights(FakeSession(), params)
+    await insights.fetch_insights(FakeSession(), params)
+
+    assert len(counted_fetch) == 2
+    assert insights._insights_cache == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_still_collapses_waiters_onto_one_lock(monkeypatch):
+    calls = []
+    first_started = asyncio.Event()
+
+    async def fake_fetch(session_factory, insight_params):
+        calls.append(insight_params)
+        if len(calls) == 1:
+            first_started.set()
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+        await asyncio.sleep(0.01)
+        return {"call": len(calls)}
+
+    monkeypatch.setattr(insights, "_fetch_insights", fake_fetch)
+
+    async def request():
+        return await insights.fetch_insights(FakeSession(), InsightParams(auv_id="AUV-1"))
+
+    first = asyncio.create_task(request())
+    await first_started.wait()
+    waiters = [asyncio.create_task(request()) for _ in range(3)]
+    await asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        await first
+    # Arrives after the failure, while the earlier waiters are still queued on the lock
+    late = asyncio.create_task(request())
+    results = await asyncio.gather(*waiters, late)
+
+    # One failed fetch, then exactly one retry shared by every other caller
+    assert len(calls) == 2
+    assert results == [{"call": 2}] * 4
+    assert insights._insights_locks == {} and insights._insights_lock_users == {}
@@ -0,0 +1,26 @@
+import logging
+from logging.handlers import QueueHandler
+
+from app.config.log import setup_logging, shutdown_logging
+
+
+def _queue_handlers():
+    return [h for h in logging.getLogger("app").handlers if isinstance(h, QueueHandler)]
+
+
+def test_setup_logging_is_idempotent_and_shutdown_detaches():
+    """Repeated lifespan startups must not stack handlers (duplicated log lines)."""
+    try:
+        setup_logging()
+        setup_logging()
+        assert len(_queue_handlers()) == 1
+    finally:
+        shutdown_logging()
+    assert _queue_handlers() == []
+
+    # A fresh startup after shutdown attaches exactly one handler again
+    try:
+        setup_logging()
+        assert len(_queue_handlers()) == 1
+    finally:
+        shutdown_logging()
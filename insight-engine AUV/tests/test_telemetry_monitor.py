@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+import orjson
+import pytest
+
+import app.main as main
+
+
+class _FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+
+class _FakeTelemetryWS:
+    """Yields the given frames, then stays open like an idle upstream."""
+
+    def __init__(self, frames):
+        self._frames = list(frames)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._frames:
+            return SimpleNamespace(type=aiohttp.WSMsgType.TEXT, data=orjson.dumps(self._frames.pop(0)))
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_bad_frame_does_not_stop_telemetry_processing(monkeypatch):
+    """A frame that breaks the threshold check is skipped; later frames are still ingested."""
+    ingested = []
+
+    async def fake_ingest(session, telemetry):
+        ingested.append(telemetry)
+        return None  # no telemetry id -> zone detection skipped
+
+    monkeypatch.setattr(main, "ingest_telemetry", fake_ingest)
+    good = [{"auv_id": "AUV_1", "temperature_c": 2.0, "turbidity": 0.1, "seq": i} for i in range(200)]
+    frames = [{"auv_id": "AUV_1", "temperature_c": "hot"}] + good
+    fake_app = SimpleNamespace(state=SimpleNamespace(
+        db_sessionmaker=_FakeSession,
+        http=SimpleNamespace(ws_connect=lambda *a, **kw: _FakeTelemetryWS(frames)),
+    ))
+
+    monitor = asyncio.create_task(main.monitor_telemetry(fake_app))
+    try:
+        for _ in range(200):
+            if len(ingested) == len(frames):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+
+    # The bad frame is still ingested (only its threshold check fails), and every good frame follows it
+    assert [t.get("seq") for t in ingested[1:]] == list(range(200))
+
+
+@pytest.mark.asyncio
+async def test_non_object_frame_is_dropped_without_stopping_consumer(monkeypatch, caplog):
+    """Valid JSON that isn't an object is rejected by the reader; the frames after it are ingested."""
+    ingested = []
+
+    async def fake_ingest(session, telemetry):
+        ingested.append(telemetry)
+        return None
+
+    monkeypatch.setattr(main, "ingest_telemetry", fake_ingest)
+    good = [{"auv_id": "AUV_1", "temperature_c": 2.0, "turbidity": 0.1, "seq": i} for i in range(10)]
+    frames = [[1, 2]] + good
+    fake_app = SimpleNamespace(state=SimpleNamespace(
+        db_sessionmaker=_FakeSession,
+        http=SimpleNamespace(ws_connect=lambda *a, **kw: _FakeTelemetryWS(frames)),
+    ))
+
+    monitor = asyncio.create_task(main.monitor_telemetry(fake_app))
+    try:
+        for _ in range(200):
+            if len(ingested) == len(good):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+
+    assert [t["seq"] for t in ingested] == list(range(10))
+    assert "Telemetry batch consumer stopped" not in caplog.text
+
+
+def test_null_reading_is_ignored_by_threshold_check():
+    assert main.env_monitor.check_thresholds({"auv_id": "AUV_1", "temperature_c": None, "turbidity": 0.1}) is None